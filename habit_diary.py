@@ -0,0 +1,721 @@
+"""Дневник привычек: SQLite-хранилище, очки, серии и награды.
+
+Запуск из командной строки:
+
+    python habit_diary.py add-habit "Зарядка" --difficulty 2
+    python habit_diary.py log "Зарядка"
+    python habit_diary.py month 2026 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import NamedTuple
+
+DB_PATH = "/workspace/habit_diary.db"
+
+# Очки за выполнение = сложность * POINTS_PER_DIFFICULTY.
+POINTS_PER_DIFFICULTY = 2
+WEEKLY_BONUS_POINTS = 10
+BADGE_POINTS = 25
+MONTHLY_GOAL_POINTS = 200
+
+# Значки за длину серии (дней подряд) и за суммарное число выполнений.
+STREAK_BADGES = {7: "STREAK_7", 30: "STREAK_30", 100: "STREAK_100"}
+TOTAL_BADGES = {10: "TOTAL_10", 50: "TOTAL_50", 250: "TOTAL_250"}
+
+_HABIT_COLUMNS = (
+    "id, name, cue, intention, min_action, difficulty,"
+    " frequency_per_week, start_date, is_active, created_at"
+)
+
+# Горячие запросы лежат в константах: execute получает каждый раз один и
+# тот же объект строки, и кэш подготовленных запросов соединения всегда
+# попадает.
+_SQL_LOG_STATE = """
+    WITH RECURSIVE walk(d, n) AS (
+        SELECT ?, 1
+        WHERE EXISTS(SELECT 1 FROM logs
+                     WHERE habit_id = ? AND kind = 'COMPLETION'
+                       AND completed = 1 AND log_date = ?)
+        UNION ALL
+        SELECT date(d, '-1 day'), n + 1 FROM walk
+        WHERE EXISTS(SELECT 1 FROM logs
+                     WHERE habit_id = ? AND kind = 'COMPLETION'
+                       AND completed = 1
+                       AND log_date = date(d, '-1 day'))
+    )
+    SELECT
+        EXISTS(SELECT 1 FROM logs
+               WHERE habit_id = ? AND kind = 'COMPLETION'
+                 AND completed = 1 AND log_date = ? LIMIT 1),
+        (SELECT COUNT(DISTINCT log_date) FROM logs
+         WHERE habit_id = ? AND kind = 'COMPLETION' AND completed = 1),
+        (SELECT COALESCE(MAX(n), 0) FROM walk)
+"""
+
+_SQL_STREAK = """
+    WITH RECURSIVE walk(d, n) AS (
+        SELECT ?, 1
+        WHERE EXISTS(SELECT 1 FROM logs
+                     WHERE habit_id = ? AND kind = 'COMPLETION'
+                       AND completed = 1 AND log_date = ?)
+        UNION ALL
+        SELECT date(d, '-1 day'), n + 1 FROM walk
+        WHERE EXISTS(SELECT 1 FROM logs
+                     WHERE habit_id = ? AND kind = 'COMPLETION'
+                       AND completed = 1
+                       AND log_date = date(d, '-1 day'))
+    )
+    SELECT COALESCE(MAX(n), 0) FROM walk
+"""
+
+_SQL_INSERT_LOG = (
+    "INSERT INTO logs (habit_id, kind, log_date, completed, points, note,"
+    " created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+_SQL_INSERT_AWARD = (
+    "INSERT INTO awards (habit_id, name, period_start, award_date,"
+    " points, created_at) VALUES (?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT DO NOTHING"
+)
+
+_SQL_WEEK_COMPLETIONS = (
+    "SELECT COUNT(1) FROM logs WHERE habit_id = ?"
+    " AND kind = 'COMPLETION' AND completed = 1"
+    " AND log_date BETWEEN ? AND ?"
+)
+
+_SQL_MONTH_POINTS = (
+    "SELECT COALESCE(SUM(points), 0) FROM logs WHERE log_date BETWEEN ? AND ?"
+)
+
+
+class Habit(NamedTuple):
+    id: int
+    name: str
+    cue: str
+    intention: str
+    min_action: str
+    difficulty: int
+    frequency_per_week: int
+    start_date: str
+    is_active: int
+    created_at: str
+
+
+def iso_to_monday(iso_year: int, iso_week: int) -> date:
+    """Вернуть понедельник заданной недели ISO-календаря."""
+    jan4 = date(iso_year, 1, 4)
+    week1_monday = jan4 - timedelta(days=jan4.isoweekday() - 1)
+    return week1_monday + timedelta(weeks=iso_week - 1)
+
+
+class HabitDiary:
+    """Дневник привычек поверх одного файла SQLite."""
+
+    def __init__(self, db_path: str = DB_PATH) -> None:
+        # Путь приводится к str один раз: sqlite3 иначе стрингифицирует
+        # Path при каждом connect.
+        self.db_path_str = str(db_path)
+        # Кортежи по умолчанию: sqlite3.Row включается точечно там, где
+        # действительно нужен доступ по имени колонки.
+        self._conn = sqlite3.connect(
+            self.db_path_str, cached_statements=256, check_same_thread=False
+        )
+        self._habit_list_cache: dict[bool, list[Habit]] = {}
+        self._ensure_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Вернуть общее долгоживущее соединение с базой."""
+        return self._conn
+
+    def _ensure_db(self) -> None:
+        conn = self._connect()
+        # WAL превращает commit в одну дозапись вместо двух fsync,
+        # synchronous=NORMAL при этом переживает падение процесса.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-20000")
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS habits (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE,
+                    cue TEXT NOT NULL DEFAULT '',
+                    intention TEXT NOT NULL DEFAULT '',
+                    min_action TEXT NOT NULL DEFAULT '',
+                    difficulty INTEGER NOT NULL DEFAULT 1,
+                    frequency_per_week INTEGER NOT NULL DEFAULT 7,
+                    start_date TEXT NOT NULL,
+                    is_active INTEGER NOT NULL DEFAULT 1,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    habit_id INTEGER REFERENCES habits(id),
+                    kind TEXT NOT NULL,
+                    log_date TEXT NOT NULL,
+                    completed INTEGER NOT NULL DEFAULT 1,
+                    points INTEGER NOT NULL DEFAULT 0,
+                    note TEXT,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS awards (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    habit_id INTEGER REFERENCES habits(id),
+                    name TEXT NOT NULL,
+                    period_start TEXT,
+                    award_date TEXT NOT NULL,
+                    points INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_logs_habit_kind_date"
+                " ON logs(habit_id, kind, log_date)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_date ON logs(log_date)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_awards_habit_name_date"
+                " ON awards(habit_id, name, award_date)"
+            )
+            # Уникальность наград обеспечивает сама база: разовые значки —
+            # один на привычку, периодические — один на период.
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_award_once"
+                " ON awards(habit_id, name) WHERE period_start IS NULL"
+            )
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_award_period"
+                " ON awards(habit_id, name, period_start)"
+                " WHERE period_start IS NOT NULL"
+            )
+            conn.execute("ANALYZE")
+
+    # -- привычки ---------------------------------------------------------
+
+    def add_habit(
+        self,
+        name: str,
+        cue: str = "",
+        intention: str = "",
+        min_action: str = "",
+        difficulty: int = 1,
+        frequency_per_week: int = 7,
+        start_date: date | None = None,
+    ) -> Habit:
+        start = (start_date or date.today()).isoformat()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO habits (name, cue, intention, min_action, difficulty,"
+                " frequency_per_week, start_date, is_active, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)",
+                (
+                    name,
+                    cue,
+                    intention,
+                    min_action,
+                    difficulty,
+                    frequency_per_week,
+                    start,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+        self._invalidate_habit_caches()
+        return self._get_habit_by_id_or_name(name)
+
+    def deactivate_habit(self, habit_ref: str) -> Habit:
+        habit = self._get_habit_by_id_or_name(habit_ref)
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE habits SET is_active = 0 WHERE id = ?", (habit.id,))
+        self._invalidate_habit_caches()
+        return self._get_habit_by_id_or_name(str(habit.id))
+
+    def _invalidate_habit_caches(self) -> None:
+        """Сбросить кэши привычек после любого изменения таблицы habits."""
+        self._get_habit_by_id_or_name.cache_clear()
+        self._habit_list_cache.clear()
+
+    def list_habits(self, include_inactive: bool = False) -> list[Habit]:
+        cached = self._habit_list_cache.get(include_inactive)
+        if cached is not None:
+            return cached
+        cur = self._connect().cursor()
+        if include_inactive:
+            cur.execute(f"SELECT {_HABIT_COLUMNS} FROM habits ORDER BY name")
+        else:
+            cur.execute(
+                f"SELECT {_HABIT_COLUMNS} FROM habits WHERE is_active = 1"
+                " ORDER BY name"
+            )
+        habits = [Habit._make(row) for row in cur.fetchall()]
+        self._habit_list_cache[include_inactive] = habits
+        return habits
+
+    @lru_cache(maxsize=128)
+    def _get_habit_by_id_or_name(self, habit_ref: str) -> Habit:
+        """Найти привычку по числовому id либо по имени."""
+        cur = self._connect().cursor()
+        if str(habit_ref).isdigit():
+            cur.execute(
+                f"SELECT {_HABIT_COLUMNS} FROM habits WHERE id = ?",
+                (int(habit_ref),),
+            )
+        else:
+            cur.execute(
+                f"SELECT {_HABIT_COLUMNS} FROM habits WHERE name = ?", (habit_ref,)
+            )
+        row = cur.fetchone()
+        if row is None:
+            raise ValueError(f"Привычка не найдена: {habit_ref}")
+        return Habit._make(row)
+
+    # -- отметки ----------------------------------------------------------
+
+    def log_completion(
+        self, habit_ref: str, day: date | None = None, note: str | None = None
+    ) -> dict | None:
+        """Отметить привычку выполненной за день.
+
+        Возвращает сводку (очки, длина серии) или None, если отметка за этот
+        день уже есть.
+        """
+        habit = self._get_habit_by_id_or_name(habit_ref)
+        log_day = day or date.today()
+        today = log_day.isoformat()
+        prev = (log_day - timedelta(days=1)).isoformat()
+        now_str = datetime.now().isoformat(timespec="seconds")
+        conn = self._connect()
+        with conn:
+            # Одним запросом: есть ли уже отметка за день, сколько выполнений
+            # всего и какая серия заканчивалась вчера (рекурсивный обход
+            # читает только дни серии, а не всю историю).
+            today_done, total_before, prev_streak = conn.execute(
+                _SQL_LOG_STATE,
+                (prev, habit.id, prev, habit.id, habit.id, today, habit.id),
+            ).fetchone()
+            if today_done:
+                return None
+            points = habit.difficulty * POINTS_PER_DIFFICULTY
+            streak_length = prev_streak + 1
+            # Помощники только собирают строки; вставляем всё разом двумя
+            # executemany в конце транзакции.
+            logs_rows = [
+                (
+                    habit.id,
+                    "COMPLETION",
+                    today,
+                    1,
+                    points,
+                    note,
+                    now_str,
+                )
+            ]
+            # Награды вставляются через ON CONFLICT DO NOTHING: уникальные
+            # индексы заменяют SELECT-проверки, rowcount решает, нужна ли
+            # строка-эхо в logs.
+            for log_row, award_row in self._award_weekly_consistency_bonus_if_eligible(
+                habit, log_day, now_str
+            ):
+                if conn.execute(_SQL_INSERT_AWARD, award_row).rowcount:
+                    logs_rows.append(log_row)
+            pending_points = sum(row[4] for row in logs_rows)
+            for log_row, award_row in self._check_and_award_badges(
+                habit, log_day, streak_length, total_before + 1, pending_points, now_str
+            ):
+                if conn.execute(_SQL_INSERT_AWARD, award_row).rowcount:
+                    logs_rows.append(log_row)
+            conn.executemany(_SQL_INSERT_LOG, logs_rows)
+        return {"habit": habit.name, "points": points, "streak": streak_length}
+
+    def _calculate_streak_length(self, habit_id: int, upto_day: date) -> int:
+        """Длина непрерывной серии выполнений, заканчивающейся в upto_day."""
+        conn = self._connect()
+        # Рекурсивный обход назад от upto_day: читаем только дни серии и
+        # останавливаемся на первом пропуске, не перебирая всю историю.
+        upto = upto_day.isoformat()
+        cur = conn.execute(_SQL_STREAK, (upto, habit_id, upto, habit_id))
+        return int(cur.fetchone()[0])
+
+    # -- бонусы и значки --------------------------------------------------
+
+    def _award_weekly_consistency_bonus_if_eligible(
+        self, habit: Habit, log_day: date, now_str: str
+    ) -> list[tuple[tuple, tuple]]:
+        """Собрать пары (строка logs, строка awards) недельного бонуса.
+
+        Сегодняшняя отметка ещё не вставлена, поэтому к счётчику недели
+        прибавляется единица; дубликаты по неделе отсекает уникальный
+        индекс при вставке.
+        """
+        # Понедельник недели считается напрямую, без isocalendar/iso_to_monday.
+        week_start = log_day - timedelta(days=log_day.weekday())
+        week_end = week_start + timedelta(days=6)
+        conn = self._connect()
+        cur = conn.execute(
+            _SQL_WEEK_COMPLETIONS,
+            (habit.id, week_start.isoformat(), week_end.isoformat()),
+        )
+        if cur.fetchone()[0] + 1 < habit.frequency_per_week:
+            return []
+        award_row = (
+            habit.id,
+            "WEEKLY_CONSISTENCY",
+            week_start.isoformat(),
+            log_day.isoformat(),
+            WEEKLY_BONUS_POINTS,
+            now_str,
+        )
+        # Бонус дублируется строкой в logs, чтобы месячная сумма очков
+        # считалась по одной таблице.
+        log_row = (
+            habit.id,
+            "BONUS",
+            log_day.isoformat(),
+            1,
+            WEEKLY_BONUS_POINTS,
+            "WEEKLY_CONSISTENCY",
+            now_str,
+        )
+        return [(log_row, award_row)]
+
+    def _check_and_award_badges(
+        self,
+        habit: Habit,
+        log_day: date,
+        streak_length: int,
+        total: int,
+        pending_points: int,
+        now_str: str,
+    ) -> list[tuple[tuple, tuple]]:
+        """Собрать пары строк значков; pending_points — ещё не вставленные очки."""
+        month_points = self._get_month_total_points(log_day) + pending_points
+        candidates: list[tuple[tuple, tuple]] = []
+        for threshold, name in STREAK_BADGES.items():
+            if streak_length == threshold:
+                candidates.append(self._award_badge(habit, name, log_day, now_str))
+        for threshold, name in TOTAL_BADGES.items():
+            if total == threshold:
+                candidates.append(self._award_badge(habit, name, log_day, now_str))
+        if month_points >= MONTHLY_GOAL_POINTS:
+            candidates.append(
+                self._award_badge(
+                    habit,
+                    "MONTHLY_GOAL",
+                    log_day,
+                    now_str,
+                    period_start=log_day.replace(day=1),
+                )
+            )
+        return candidates
+
+    def _award_badge(
+        self,
+        habit: Habit,
+        name: str,
+        log_day: date,
+        now_str: str,
+        period_start: date | None = None,
+    ) -> tuple[tuple, tuple]:
+        """Построить пару (строка logs, строка awards) для значка.
+
+        Проверку «уже выдан» делает уникальный индекс при вставке.
+        """
+        award_row = (
+            habit.id,
+            name,
+            period_start.isoformat() if period_start else None,
+            log_day.isoformat(),
+            BADGE_POINTS,
+            now_str,
+        )
+        log_row = (
+            habit.id,
+            "BADGE",
+            log_day.isoformat(),
+            1,
+            BADGE_POINTS,
+            name,
+            now_str,
+        )
+        return log_row, award_row
+
+    # -- отчёты -----------------------------------------------------------
+
+    def _get_month_total_points(self, day: date) -> int:
+        """Сумма очков за календарный месяц, в который попадает day."""
+        month_start = day.replace(day=1)
+        if month_start.month == 12:
+            next_month = month_start.replace(year=month_start.year + 1, month=1)
+        else:
+            next_month = month_start.replace(month=month_start.month + 1)
+        month_end = next_month - timedelta(days=1)
+        conn = self._connect()
+        # Награды продублированы строками в logs, поэтому достаточно
+        # суммы по одной таблице.
+        p_logs = conn.execute(
+            _SQL_MONTH_POINTS,
+            (month_start.isoformat(), month_end.isoformat()),
+        ).fetchone()[0]
+        return int(p_logs)
+
+    def month_summary(self, year: int, month: int) -> dict:
+        """Сводка за месяц: очки по привычкам, награды и общий итог."""
+        month_start = date(year, month, 1)
+        if month == 12:
+            next_month = date(year + 1, 1, 1)
+        else:
+            next_month = date(year, month + 1, 1)
+        month_end = next_month - timedelta(days=1)
+        first = month_start.isoformat()
+        last = month_end.isoformat()
+        cur = self._connect().cursor()
+        cur.row_factory = sqlite3.Row
+        # Общий итог приезжает тем же запросом строкой-сигналом с id IS NULL,
+        # отсортированной в конец; отдельный проход по per_habit не нужен.
+        cur.execute(
+            "SELECT h.id AS id, h.name AS name, COALESCE(SUM(l.points), 0) AS points,"
+            " SUM(CASE WHEN l.kind = 'COMPLETION' THEN 1 ELSE 0 END) AS completions"
+            " FROM habits h JOIN logs l ON l.habit_id = h.id"
+            " WHERE l.log_date BETWEEN ? AND ?"
+            "   AND l.kind IN ('COMPLETION', 'BONUS', 'BADGE')"
+            " GROUP BY h.id, h.name"
+            " UNION ALL"
+            " SELECT NULL, NULL, COALESCE(SUM(points), 0),"
+            " SUM(CASE WHEN kind = 'COMPLETION' THEN 1 ELSE 0 END)"
+            " FROM logs WHERE log_date BETWEEN ? AND ?"
+            "   AND kind IN ('COMPLETION', 'BONUS', 'BADGE')"
+            "   AND habit_id IS NOT NULL",
+            (first, last, first, last),
+        )
+        per_habit = []
+        total_points = 0
+        for row in cur.fetchall():
+            if row["id"] is None:
+                total_points = row["points"]
+            else:
+                per_habit.append(
+                    (row["id"], row["name"], row["points"], row["completions"])
+                )
+        per_habit.sort(key=lambda item: item[2], reverse=True)
+        cur.execute(
+            "SELECT name, COUNT(1) AS n FROM awards"
+            " WHERE award_date BETWEEN ? AND ? GROUP BY name",
+            (first, last),
+        )
+        awards = {row["name"]: row["n"] for row in cur.fetchall()}
+        return {
+            "year": year,
+            "month": month,
+            "per_habit": per_habit,
+            "awards": awards,
+            "total_points": total_points,
+        }
+
+    def add_weekly_review(self, text: str, day: date | None = None) -> None:
+        """Сохранить заметку-обзор недели (привязывается к понедельнику)."""
+        review_day = day or date.today()
+        week_start = review_day - timedelta(days=review_day.weekday())
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO logs (habit_id, kind, log_date, completed, points, note,"
+                " created_at) VALUES (NULL, 'REVIEW', ?, 1, 0, ?, ?)",
+                (
+                    week_start.isoformat(),
+                    text,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+
+
+# -- командная строка -----------------------------------------------------
+
+
+def _int_in_range(lo: int, hi: int):
+    """Проверка числового аргумента без choices=range(...) в help."""
+
+    def convert(value: str) -> int:
+        number = int(value)
+        if not lo <= number <= hi:
+            raise argparse.ArgumentTypeError(f"ожидается число от {lo} до {hi}")
+        return number
+
+    return convert
+
+
+def _add_add_habit_parser(sub) -> None:
+    p = sub.add_parser("add-habit", help="добавить новую привычку")
+    p.add_argument("name", help="название привычки")
+    p.add_argument("--cue", default="", help="триггер (после чего выполнять)")
+    p.add_argument("--intention", default="", help="намерение (зачем это нужно)")
+    p.add_argument(
+        "--min-action", default="", help="минимальное действие на плохой день"
+    )
+    p.add_argument(
+        "--difficulty", type=_int_in_range(1, 5), default=1,
+        help="сложность от 1 до 5 (влияет на очки)",
+    )
+    p.add_argument(
+        "--frequency-per-week", type=_int_in_range(1, 7), default=7,
+        help="сколько раз в неделю нужно выполнять",
+    )
+
+
+def _add_log_parser(sub) -> None:
+    p = sub.add_parser("log", help="отметить привычку выполненной")
+    p.add_argument("habit", help="id или название привычки")
+    p.add_argument("--date", help="дата в формате YYYY-MM-DD (по умолчанию сегодня)")
+    p.add_argument("--note", help="заметка к отметке")
+
+
+def _add_list_parser(sub) -> None:
+    p = sub.add_parser("list", help="показать список привычек")
+    p.add_argument("--all", action="store_true", help="включая остановленные привычки")
+
+
+def _add_streak_parser(sub) -> None:
+    p = sub.add_parser("streak", help="текущая серия по привычке")
+    p.add_argument("habit", help="id или название привычки")
+    p.add_argument("--date", help="считать серию на эту дату")
+
+
+def _add_month_parser(sub) -> None:
+    p = sub.add_parser("month", help="сводка за месяц")
+    p.add_argument("year", type=int, help="год, например 2026")
+    p.add_argument("month", type=_int_in_range(1, 12), help="месяц 1-12")
+
+
+def _add_review_parser(sub) -> None:
+    p = sub.add_parser("review", help="записать обзор недели")
+    p.add_argument("text", help="текст обзора")
+    p.add_argument("--date", help="любая дата нужной недели")
+
+
+def _add_deactivate_parser(sub) -> None:
+    p = sub.add_parser("deactivate", help="остановить привычку")
+    p.add_argument("habit", help="id или название привычки")
+
+
+_SUBCOMMANDS = {
+    "add-habit": _add_add_habit_parser,
+    "log": _add_log_parser,
+    "list": _add_list_parser,
+    "streak": _add_streak_parser,
+    "month": _add_month_parser,
+    "review": _add_review_parser,
+    "deactivate": _add_deactivate_parser,
+}
+
+
+def build_parser(only: str | None = None) -> argparse.ArgumentParser:
+    """Собрать парсер; с only строится только нужная подкоманда."""
+    parser = argparse.ArgumentParser(
+        prog="habit_diary", description="Дневник привычек с очками и наградами"
+    )
+    parser.add_argument(
+        "--db", default=DB_PATH, help="путь к файлу базы данных"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, add_subparser in _SUBCOMMANDS.items():
+        if only is None or name == only:
+            add_subparser(sub)
+    return parser
+
+
+def _peek_command(argv: list[str]) -> str | None:
+    """Найти имя подкоманды, перешагнув через глобальный --db."""
+    skip_next = False
+    for token in argv:
+        if skip_next:
+            skip_next = False
+            continue
+        if token == "--db":
+            skip_next = True
+            continue
+        if token.startswith("-"):
+            continue
+        return token
+    return None
+
+
+def _parse_day(value: str | None) -> date | None:
+    if value is None:
+        return None
+    return date.fromisoformat(value)
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    command = _peek_command(argv)
+    only = command if command in _SUBCOMMANDS else None
+    args = build_parser(only).parse_args(argv)
+    diary = HabitDiary(args.db)
+    if args.command == "add-habit":
+        habit = diary.add_habit(
+            args.name,
+            cue=args.cue,
+            intention=args.intention,
+            min_action=args.min_action,
+            difficulty=args.difficulty,
+            frequency_per_week=args.frequency_per_week,
+        )
+        print(f"Добавлена привычка #{habit.id}: {habit.name}")
+    elif args.command == "log":
+        result = diary.log_completion(
+            args.habit, day=_parse_day(args.date), note=args.note
+        )
+        if result is None:
+            print("Эта привычка уже отмечена за этот день.")
+        else:
+            print(
+                f"{result['habit']}: +{result['points']} очков,"
+                f" серия {result['streak']} дн."
+            )
+    elif args.command == "list":
+        for habit in diary.list_habits(include_inactive=args.all):
+            status = "" if habit.is_active else " (остановлена)"
+            print(f"#{habit.id} {habit.name}{status}")
+    elif args.command == "streak":
+        habit = diary._get_habit_by_id_or_name(args.habit)
+        day = _parse_day(args.date) or date.today()
+        streak = diary._calculate_streak_length(habit.id, day)
+        print(f"{habit.name}: серия {streak} дн.")
+    elif args.command == "month":
+        summary = diary.month_summary(args.year, args.month)
+        for _, name, points, completions in summary["per_habit"]:
+            print(f"{name}: {points} очков ({completions} выполнений)")
+        for name, n in summary["awards"].items():
+            print(f"Награда {name}: x{n}")
+        print(f"Итого очков: {summary['total_points']}")
+    elif args.command == "review":
+        diary.add_weekly_review(args.text, day=_parse_day(args.date))
+        print("Обзор недели сохранён.")
+    elif args.command == "deactivate":
+        habit = diary.deactivate_habit(args.habit)
+        print(f"Привычка остановлена: {habit.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,564 @@
+"""Журнал привычек: очки за отметки, серии и значки.
+
+В отличие от дневника (habit_diary), журнал хранит длину серии прямо в
+строке отметки и выдаёт значки за пороги очков.
+
+    python habit_journal.py add "Медитация"
+    python habit_journal.py log "Медитация"
+    python habit_journal.py status
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import date as date_class
+from datetime import datetime, timedelta
+from os.path import expanduser
+from typing import NamedTuple
+
+DEFAULT_DB = "~/.habit_journal.db"
+SCHEMA_VERSION = 1
+
+BASE_POINTS = 10
+STREAK_BONUS_STEP = 2
+STREAK_BONUS_CAP = 20
+COMBO_BONUS = 5
+
+POINTS_THRESHOLDS = [
+    (100, "POINTS_100"),
+    (500, "POINTS_500"),
+    (1000, "POINTS_1000"),
+    (2000, "POINTS_2000"),
+    (5000, "POINTS_5000"),
+]
+
+# Горячие запросы — в константах модуля: execute каждый раз получает один
+# и тот же объект строки, и кэш подготовленных выражений соединения
+# всегда попадает.
+SQL_PREV_AND_COMBO = (
+    "SELECT"
+    " (SELECT streak_count FROM logs WHERE habit_id = ? AND date = ?)"
+    "   AS prev_streak,"
+    " (SELECT COUNT(*) FROM logs WHERE date = ?) AS today_cnt"
+)
+
+SQL_INSERT_LOG = (
+    "INSERT INTO logs (habit_id, date, streak_count, points_awarded,"
+    " created_at) VALUES (?, ?, ?, ?, ?)"
+)
+
+SQL_INSERT_BADGE = (
+    "INSERT OR IGNORE INTO badges (code, title, description, awarded_at,"
+    " habit_id, points_at_award) VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+SQL_TOTAL_POINTS = (
+    "SELECT CAST(value AS INTEGER) AS total FROM meta WHERE key = 'total_points'"
+)
+
+SQL_BUMP_TOTAL_POINTS = (
+    "UPDATE meta SET value = CAST(value AS INTEGER) + ?"
+    " WHERE key = 'total_points'"
+)
+
+SQL_STREAK_BADGE_EXISTS = "SELECT 1 FROM badges WHERE code = ? AND habit_id = ?"
+
+# Пороговые длины серий как битовая маска: проверка «серия — юбилейная?»
+# на каждой отметке сводится к сдвигу и AND вместо поиска по списку.
+_STREAK_MILESTONES = (3, 7, 14, 30, 60, 100)
+_STREAK_MASK = sum(1 << n for n in _STREAK_MILESTONES)
+
+SQL_DAY_STATUS = (
+    "SELECT h.id AS id, h.name AS name,"
+    " EXISTS(SELECT 1 FROM logs WHERE habit_id = h.id AND date = ?)"
+    "   AS done,"
+    " COALESCE((SELECT streak_count FROM logs"
+    "           WHERE habit_id = h.id AND date = ?), 0) AS streak"
+    " FROM habits h WHERE h.is_active = 1 ORDER BY h.name"
+)
+
+BADGE_DEFS = {
+    "FIRST_STEP": ("Первый шаг", "Первая отметка в журнале"),
+    "STREAK_3": ("Три дня", "Серия из 3 дней"),
+    "STREAK_7": ("Неделя", "Серия из 7 дней"),
+    "STREAK_14": ("Две недели", "Серия из 14 дней"),
+    "STREAK_30": ("Месяц", "Серия из 30 дней"),
+    "STREAK_60": ("Два месяца", "Серия из 60 дней"),
+    "STREAK_100": ("Сто дней", "Серия из 100 дней"),
+    "POINTS_100": ("Сотня", "100 очков суммарно"),
+    "POINTS_500": ("Пять сотен", "500 очков суммарно"),
+    "POINTS_1000": ("Тысяча", "1000 очков суммарно"),
+    "POINTS_2000": ("Две тысячи", "2000 очков суммарно"),
+    "POINTS_5000": ("Пять тысяч", "5000 очков суммарно"),
+}
+
+
+class Badge(NamedTuple):
+    code: str
+    title: str
+    description: str
+    awarded_at: str
+    habit_id: int | None
+    points_at_award: int
+
+
+def parse_date(s: str | None) -> date_class:
+    """Разобрать дату YYYY-MM-DD; пустое значение — сегодня."""
+    if not s:
+        return date_class.today()
+    try:
+        return date_class.fromisoformat(s)
+    except ValueError as exc:
+        raise ValueError("Ожидается дата в формате YYYY-MM-DD") from exc
+
+
+def is_valid_iso_date(s: str) -> bool:
+    try:
+        parse_date(s)
+    except ValueError:
+        return False
+    return True
+
+
+class HabitJournal:
+    """Журнал привычек поверх одного файла SQLite."""
+
+    def __init__(self, db_path: str = DEFAULT_DB) -> None:
+        expanded = expanduser(db_path)
+        self.connection = sqlite3.connect(
+            expanded,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        self.connection.row_factory = sqlite3.Row
+        self._configure_connection()
+        self.ensure_schema()
+
+    def _configure_connection(self) -> None:
+        """Настроить соединение: WAL, внешние ключи и кэш."""
+        cursor = self.connection.cursor()
+        # WAL сводит commit к одной дозаписи журнала; synchronous=NORMAL
+        # при этом остаётся долговечным при падении процесса.
+        cursor.executescript(
+            "PRAGMA journal_mode=WAL;"
+            " PRAGMA synchronous=NORMAL;"
+            " PRAGMA foreign_keys=ON;"
+            " PRAGMA temp_store=MEMORY;"
+            " PRAGMA cache_size=-20000;"
+            " PRAGMA mmap_size=268435456;"
+        )
+        self.connection.execute("PRAGMA busy_timeout=5000")
+
+    @contextmanager
+    def _tx(self):
+        """Одна явная транзакция: BEGIN IMMEDIATE ... COMMIT/ROLLBACK."""
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        else:
+            self.connection.execute("COMMIT")
+
+    def ensure_schema(self) -> None:
+        # На уже созданной базе (обычный случай для короткого вызова CLI)
+        # достаточно одного чтения user_version вместо всех CREATE ... IF
+        # NOT EXISTS и commit.
+        cursor = self.connection.cursor()
+        if cursor.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+            return
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS habits (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                is_active INTEGER NOT NULL DEFAULT 1,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                habit_id INTEGER NOT NULL REFERENCES habits(id),
+                date TEXT NOT NULL,
+                streak_count INTEGER NOT NULL DEFAULT 1,
+                points_awarded INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                UNIQUE (habit_id, date)
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS badges (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                code TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                awarded_at TEXT NOT NULL,
+                habit_id INTEGER REFERENCES habits(id),
+                points_at_award INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (code, habit_id)
+            )
+            """
+        )
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_badges_global"
+            " ON badges(code) WHERE habit_id IS NULL"
+        )
+        # Покрывающий индекс по дате: агрегаты месячного отчёта и счётчик
+        # «кто ещё отмечен сегодня» читаются целиком из индекса.
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_logs_date_cover"
+            " ON logs(date, points_awarded, streak_count, habit_id)"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_badges_code ON badges(code)")
+        cursor.execute("ANALYZE")
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+            """
+        )
+        cursor.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)",
+            (str(SCHEMA_VERSION),),
+        )
+        # Бегущая сумма очков: на существующей базе засеивается из logs,
+        # дальше обновляется вместе с каждой отметкой.
+        cursor.execute(
+            "INSERT OR IGNORE INTO meta (key, value)"
+            " SELECT 'total_points', COALESCE(SUM(points_awarded), 0) FROM logs"
+        )
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION:d}")
+        self.connection.commit()
+
+    # -- привычки ---------------------------------------------------------
+
+    def add_habit(self, name: str) -> int:
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "INSERT INTO habits (name, is_active, created_at) VALUES (?, 1, ?)",
+            (name, datetime.utcnow().isoformat(timespec="seconds")),
+        )
+        self.connection.commit()
+        return int(cursor.lastrowid)
+
+    def list_habits(self) -> list[sqlite3.Row]:
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT id, name FROM habits WHERE is_active = 1 ORDER BY name")
+        return cursor.fetchall()
+
+    def _get_habit(self, habit_ref: str) -> sqlite3.Row:
+        cursor = self.connection.cursor()
+        if str(habit_ref).isdigit():
+            cursor.execute(
+                "SELECT id, name FROM habits WHERE id = ? AND is_active = 1",
+                (int(habit_ref),),
+            )
+        else:
+            cursor.execute(
+                "SELECT id, name FROM habits WHERE name = ? AND is_active = 1",
+                (habit_ref,),
+            )
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Привычка не найдена: {habit_ref}")
+        return row
+
+    # -- отметки ----------------------------------------------------------
+
+    def log_completion(self, habit_ref: str, date_str: str | None = None) -> dict | None:
+        """Отметить привычку; вернуть очки и серию или None при повторе."""
+        habit = self._get_habit(habit_ref)
+        log_day = parse_date(date_str)
+        iso_date = log_day.isoformat()
+        prev_iso = (log_day - timedelta(days=1)).isoformat()
+
+        with self._tx():
+            # Одна метка времени на всю транзакцию: и для строки отметки,
+            # и для всех значков, которые она принесёт.
+            now_iso = datetime.utcnow().isoformat(timespec="seconds")
+            # Вчерашняя серия и счётчик отметок за день — одним запросом;
+            # NULL вместо вчерашней серии сам по себе значит «вчера пропуск».
+            # Распаковка по позиции: без поиска колонок по имени на каждую
+            # отметку.
+            prev_streak, today_cnt = self.connection.execute(
+                SQL_PREV_AND_COMBO, (habit["id"], prev_iso, iso_date)
+            ).fetchone()
+            current_streak = (prev_streak or 0) + 1
+            points = (
+                BASE_POINTS
+                + min((current_streak - 1) * STREAK_BONUS_STEP, STREAK_BONUS_CAP)
+                + (COMBO_BONUS if today_cnt else 0)
+            )
+
+            try:
+                self.connection.execute(
+                    SQL_INSERT_LOG,
+                    (habit["id"], iso_date, current_streak, points, now_iso),
+                )
+            except sqlite3.IntegrityError:
+                return None
+            self.connection.execute(SQL_BUMP_TOTAL_POINTS, (points,))
+
+            badges = []
+            badges.extend(self._maybe_award_first_step_badge(now_iso))
+            badges.extend(
+                self._maybe_award_streak_badge(habit["id"], current_streak, now_iso)
+            )
+            badges.extend(self._maybe_award_points_threshold_badges(now_iso))
+        return {
+            "habit": habit["name"],
+            "points": points,
+            "streak": current_streak,
+            "badges": badges,
+        }
+
+    def _get_total_points(self) -> int:
+        # O(1): читаем бегущий счётчик из meta вместо суммирования logs.
+        row = self.connection.execute(SQL_TOTAL_POINTS).fetchone()
+        return int(row["total"])
+
+    # -- значки -----------------------------------------------------------
+
+    def _maybe_award_first_step_badge(self, now_iso: str) -> list[Badge]:
+        row = self.connection.execute("SELECT COUNT(*) AS n FROM logs").fetchone()
+        if int(row["n"]) != 1:
+            return []
+        return [
+            self._award_badge(
+                "FIRST_STEP",
+                habit_id=None,
+                points_at_award=self._get_total_points(),
+                awarded_at=now_iso,
+            )
+        ]
+
+    def _maybe_award_streak_badge(
+        self, habit_id: int, streak_count: int, now_iso: str
+    ) -> list[Badge]:
+        if streak_count <= 100 and (_STREAK_MASK >> streak_count) & 1:
+            code = f"STREAK_{streak_count}"
+            row = self.connection.execute(
+                SQL_STREAK_BADGE_EXISTS, (code, habit_id)
+            ).fetchone()
+            if row is None:
+                return [
+                    self._award_badge(
+                        code,
+                        habit_id=habit_id,
+                        points_at_award=self._get_total_points(),
+                        awarded_at=now_iso,
+                    )
+                ]
+        return []
+
+    def _maybe_award_points_threshold_badges(self, now_iso: str) -> list[Badge]:
+        # Один SELECT по всем кодам и одна сумма очков вместо запроса
+        # на каждый порог.
+        cursor = self.connection.cursor()
+        codes = [code for _, code in POINTS_THRESHOLDS]
+        placeholders = ", ".join("?" for _ in codes)
+        cursor.execute(
+            "SELECT code FROM badges WHERE habit_id IS NULL"
+            f" AND code IN ({placeholders})",
+            codes,
+        )
+        existing = {row["code"] for row in cursor.fetchall()}
+        total = self._get_total_points()
+        new_badges = [
+            Badge(code, *BADGE_DEFS[code], now_iso, None, total)
+            for threshold, code in POINTS_THRESHOLDS
+            if threshold <= total and code not in existing
+        ]
+        if new_badges:
+            # Badge — кортеж в порядке колонок INSERT, поэтому пачка
+            # порогов уходит одним executemany вместо execute на значок.
+            cursor.executemany(SQL_INSERT_BADGE, new_badges)
+        return new_badges
+
+    def _award_badge(
+        self, code: str, habit_id: int | None, points_at_award: int, awarded_at: str
+    ) -> Badge:
+        title, description = BADGE_DEFS[code]
+        self.connection.execute(
+            SQL_INSERT_BADGE,
+            (code, title, description, awarded_at, habit_id, points_at_award),
+        )
+        return Badge(code, title, description, awarded_at, habit_id, points_at_award)
+
+    def list_badges(self) -> list[Badge]:
+        # Обычные кортежи вместо sqlite3.Row: SELECT перечисляет колонки в
+        # порядке полей Badge, так что доступ по имени здесь не нужен.
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            "SELECT code, title, description, awarded_at, habit_id, points_at_award"
+            " FROM badges ORDER BY awarded_at, id"
+        )
+        return [Badge(*row) for row in cursor.fetchall()]
+
+    # -- отчёты -----------------------------------------------------------
+
+    def get_day_status(self, date_str: str | None = None) -> list[dict]:
+        """Состояние всех привычек на день: отмечена ли и какая серия.
+
+        Один запрос на все привычки: серия на отмеченный день уже лежит в
+        streak_count этой же строки, поэтому ни обхода по дням, ни пары
+        запросов на привычку не нужно.
+        """
+        iso_date = parse_date(date_str).isoformat()
+        cursor = self.connection.execute(SQL_DAY_STATUS, (iso_date, iso_date))
+        return [
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "done": bool(row["done"]),
+                "streak": row["streak"],
+            }
+            for row in cursor.fetchall()
+        ]
+
+    def month_report(self, year: int, month: int) -> dict:
+        """Отчёт за месяц: очки, отметки, лучшая серия и топ привычек."""
+        first = date_class(year, month, 1).isoformat()
+        if month == 12:
+            next_first = date_class(year + 1, 1, 1)
+        else:
+            next_first = date_class(year, month + 1, 1)
+        last = (next_first - timedelta(days=1)).isoformat()
+        # Все агрегаты окна — одним проходом по idx_logs_date_cover вместо
+        # четырёх одинаковых сканов диапазона дат.
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            "WITH m AS (SELECT habit_id, points_awarded, streak_count"
+            "           FROM logs WHERE date BETWEEN ? AND ?)"
+            " SELECT COALESCE(SUM(points_awarded), 0), COUNT(*),"
+            " COALESCE(MAX(streak_count), 0), COUNT(DISTINCT habit_id)"
+            " FROM m",
+            (first, last),
+        )
+        total_points, total_logs, best_streak, active_habits = cursor.fetchone()
+        # Кортежи уже в нужной форме (имя, отметки, очки) — без Row.
+        top_cursor = self.connection.cursor()
+        top_cursor.row_factory = None
+        top_cursor.execute(
+            "SELECT h.name, COUNT(*), SUM(l.points_awarded) AS points"
+            " FROM logs l JOIN habits h ON h.id = l.habit_id"
+            " WHERE l.date BETWEEN ? AND ?"
+            " GROUP BY h.id, h.name ORDER BY points DESC LIMIT 5",
+            (first, last),
+        )
+        top_habits = top_cursor.fetchall()
+        return {
+            "year": year,
+            "month": month,
+            "total_points": total_points,
+            "total_logs": total_logs,
+            "best_streak": best_streak,
+            "active_habits": active_habits,
+            "top_habits": top_habits,
+        }
+
+
+# -- командная строка -----------------------------------------------------
+
+
+def cmd_add(args: argparse.Namespace) -> None:
+    journal = HabitJournal(args.db)
+    habit_id = journal.add_habit(args.name)
+    print(f"Добавлена привычка #{habit_id}: {args.name}")
+
+
+def cmd_log(args: argparse.Namespace) -> None:
+    journal = HabitJournal(args.db)
+    result = journal.log_completion(args.habit, args.date)
+    if result is None:
+        print("Эта привычка уже отмечена за этот день.")
+        return
+    print(
+        f"{result['habit']}: +{result['points']} очков,"
+        f" серия {result['streak']} дн."
+    )
+    for badge in result["badges"]:
+        print(f"Новый значок: {badge.title} — {badge.description}")
+
+
+def cmd_status(args: argparse.Namespace) -> None:
+    journal = HabitJournal(args.db)
+    for entry in journal.get_day_status(args.date):
+        mark = "x" if entry["done"] else " "
+        print(f"[{mark}] {entry['name']} (серия {entry['streak']} дн.)")
+
+
+def cmd_badges(args: argparse.Namespace) -> None:
+    journal = HabitJournal(args.db)
+    for badge in journal.list_badges():
+        print(f"{badge.awarded_at} {badge.title} — {badge.description}")
+
+
+def cmd_month(args: argparse.Namespace) -> None:
+    journal = HabitJournal(args.db)
+    report = journal.month_report(args.year, args.month)
+    print(f"Очки за месяц: {report['total_points']}")
+    print(f"Отметок: {report['total_logs']}")
+    print(f"Лучшая серия: {report['best_streak']} дн.")
+    print(f"Активных привычек: {report['active_habits']}")
+    for name, logs_count, points in report["top_habits"]:
+        print(f"  {name}: {points} очков ({logs_count} отметок)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="habit_journal", description="Журнал привычек с очками и значками"
+    )
+    parser.add_argument("--db", default=DEFAULT_DB, help="путь к файлу базы данных")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("add", help="добавить привычку")
+    p.add_argument("name", help="название привычки")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("log", help="отметить привычку выполненной")
+    p.add_argument("habit", help="id или название привычки")
+    p.add_argument("--date", help="дата YYYY-MM-DD (по умолчанию сегодня)")
+    p.set_defaults(func=cmd_log)
+
+    p = sub.add_parser("status", help="состояние привычек на день")
+    p.add_argument("--date", help="дата YYYY-MM-DD (по умолчанию сегодня)")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser("badges", help="список полученных значков")
+    p.set_defaults(func=cmd_badges)
+
+    p = sub.add_parser("month", help="отчёт за месяц")
+    p.add_argument("year", type=int, help="год, например 2026")
+    p.add_argument("month", type=int, help="месяц 1-12")
+    p.set_defaults(func=cmd_month)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())